@@ -0,0 +1,102 @@
+"""
+Shared file helpers for the maintenance scripts in this directory.
+Paths are plain strings throughout; wrap in pathlib.Path only where needed.
+"""
+import hashlib
+import json
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_FILE = os.path.join(ROOT, '.cache', 'processed.json')
+SKIP_DIRS = {'.git', 'node_modules', 'assets'}
+# Below this many files, starting worker processes costs more than it saves
+PARALLEL_MIN_FILES = 256
+# O_BINARY only exists (and matters) on Windows, where fds default to text mode
+WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+
+
+def walk_files(root, suffixes=('.html',), skip=SKIP_DIRS):
+    """Yield paths under root whose name ends with one of suffixes (compared
+    case-insensitively, so suffixes must be lowercase), pruning skip dirs."""
+    stack = [root]
+    while stack:
+        d = stack.pop()
+        with os.scandir(d) as it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    if e.name not in skip:
+                        stack.append(e.path)
+                elif e.name.lower().endswith(suffixes):
+                    yield e.path
+
+
+def map_files(fn, paths, initializer=None, initargs=()):
+    """Return [fn(path) for path in paths], in order. Fans out to a process pool
+    only on multi-core machines with at least PARALLEL_MIN_FILES paths; otherwise
+    runs initializer(*initargs) and fn in this process."""
+    paths = list(paths)
+    if (os.cpu_count() or 1) == 1 or len(paths) < PARALLEL_MIN_FILES:
+        if initializer is not None:
+            initializer(*initargs)
+        return list(map(fn, paths))
+    # imported here: pulling in multiprocessing costs more than a small run
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(initializer=initializer, initargs=initargs) as ex:
+        return list(ex.map(fn, paths, chunksize=32))
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def read_text(path):
+    return read_bytes(path).decode('utf-8')
+
+
+def write_bytes(path, data):
+    # straight to the fd: no buffered or text layer on top
+    fd = os.open(path, WRITE_FLAGS, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def write_text(path, text):
+    write_bytes(path, text.encode('utf-8'))
+
+
+def rewrite_tail(path, offset, tail):
+    """Replace everything from offset onwards with tail; earlier bytes are not rewritten."""
+    with open(path, 'r+b') as f:
+        f.seek(offset)
+        f.write(tail)
+        f.truncate()
+
+
+def content_digest(raw):
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _read_cache_file():
+    try:
+        with open(CACHE_FILE, 'rb') as f:
+            return json.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+
+
+def load_cache(key):
+    """Return the {path: digest} map a previous run saved under key."""
+    return _read_cache_file().get(key, {})
+
+
+def save_cache(key, entries):
+    """Replace the {path: digest} map stored under key, keeping other keys."""
+    data = _read_cache_file()
+    data[key] = entries
+    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+    write_text(CACHE_FILE, json.dumps(data, indent=1, sort_keys=True))
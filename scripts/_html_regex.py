@@ -0,0 +1,42 @@
+"""
+Compiled regexes shared by the maintenance scripts in this directory.
+Importing them from here compiles each pattern once per process, however many
+scripts use it.
+"""
+import re
+
+# <link rel="canonical" href="..."> as rewritten by generate_clean_pages:
+# group 1 is everything up to the href value, group 2 the value, group 3 the rest
+CANONICAL_RE = re.compile(r'(<link[^>]*rel=["\']canonical["\'][^>]*href=["\'])([^"\']+)(["\'][^>]*>)', re.I)
+
+# Prefilter for CANONICAL_RE: a page without this word (in any case) cannot match
+CANONICAL_WORD_RE = re.compile('canonical', re.I)
+
+# Canonical/social tags rewritten by fix_canonical_and_social, as
+# (group name, pattern). Image tags expose their content as <name>_src.
+SOCIAL_TAG_PATTERNS = (
+    ('canonical', r'<link\s+rel=(?:"|\')canonical(?:"|\')\s+href=(?:"|\')[^"\']*(?:"|\')\s*>'),
+    ('og_url', r'<meta\s+property=(?:"|\')og:url(?:"|\')\s+content=(?:"|\')[^"\']*(?:"|\')\s*>'),
+    ('twitter_url', r'<meta\s+name=(?:"|\')twitter:url(?:"|\')\s+content=(?:"|\')[^"\']*(?:"|\')\s*>'),
+    ('og_image', r'<meta\s+property=(?:"|\')og:image(?:"|\')\s+content=(?:"|\')(?P<og_image_src>[^"\']*)(?:"|\')\s*>'),
+    ('twitter_image', r'<meta\s+name=(?:"|\')twitter:image(?:"|\')\s+content=(?:"|\')(?P<twitter_image_src>[^"\']*)(?:"|\')\s*>'),
+)
+# One alternation over all of them, so a file is scanned once; dispatch on m.lastgroup
+SOCIAL_TAGS_RE = re.compile('|'.join(f'(?P<{name}>{pat})' for name, pat in SOCIAL_TAG_PATTERNS), re.I)
+
+# Byte-level prefilter for SOCIAL_TAGS_RE: a file without any of these tokens
+# cannot match. Case-insensitive, like the tag patterns themselves.
+SOCIAL_HINT_RE = re.compile(rb'canonical|og:|twitter:', re.I)
+
+# Any URL (absolute, host-relative or bare host) into /assets/; group 1 is the path
+ASSETS_RE = re.compile(r'^(?:https?://)?(?:www\.)?[^/]*(/assets/.*)$')
+
+# Legacy <base> tag, matched on raw bytes: the indented tag together with the
+# line break before it, else the bare tag and at most one line break after it
+BASE_RE = re.compile(rb'\r?\n    <base href="/gotoolly\.com/">|<base href="/gotoolly\.com/">(?:\r?\n)?')
+
+# Root-absolute href="/ and src="/ (either quote), plus quoted '/assets/...
+# literals in inline JS such as l1.href = '/assets/...'. The match is just the
+# quote (group 1) and slash; anchoring on those and checking the attribute by
+# lookbehind keeps the scan close to str.find speed.
+ROOT_PATH_RE = re.compile(r'(["\'])/(?:(?<= href=["\']/)|(?<= src=["\']/)|(?=assets/))')
@@ -4,24 +4,33 @@ Fix <link rel="canonical">, og:url, twitter:url, and og/twitter image tags to be
 using the given domain. Dry-run by default; use --apply to write changes.
 """
 import argparse
+import os
+from functools import lru_cache, partial
 from pathlib import Path
-import re
 
-parser = argparse.ArgumentParser()
-parser.add_argument('--domain', default='https://gotoolly.netlify.app')
-parser.add_argument('--apply', action='store_true')
-args = parser.parse_args()
+from _html_files import content_digest, load_cache, map_files, read_bytes, save_cache, walk_files, write_bytes
+from _html_regex import ASSETS_RE, SOCIAL_HINT_RE, SOCIAL_TAGS_RE
 
 ROOT = Path(__file__).resolve().parents[1]
-changed = []
+ROOT_PREFIX = str(ROOT) + os.sep
+
+# Set per worker process by _init()
+DOMAIN = None
+APPLY = False
+CACHE = {}
+# Image tags up to and including the domain, so a hit is a plain concatenation
+OG_IMAGE_OPEN = None
+TWITTER_IMAGE_OPEN = None
+TAG_CLOSE = '">'
 
 # Helpers
 
-def page_url_for(path: Path, domain: str) -> str:
-    rel = path.relative_to(ROOT).as_posix()
+def page_url_for(path: str, domain: str) -> str:
+    # plain string slicing; walk_files yields paths under ROOT_PREFIX
+    rel = path[len(ROOT_PREFIX):].replace(os.sep, '/')
     if rel.endswith('index.html'):
-        parent = Path(rel).parent.as_posix()
-        if parent == '.':
+        parent = rel.rpartition('/')[0]
+        if not parent:
             return domain + '/'
         else:
             return domain + '/' + parent
@@ -29,72 +38,123 @@ def page_url_for(path: Path, domain: str) -> str:
         # remove .html extension
         return domain + '/' + rel[:-5]
 
-can_re = re.compile(r'<link\s+rel=(?:"|\')canonical(?:"|\')\s+href=(?:"|\')([^"\']*)(?:"|\')\s*>', re.I)
-og_url_re = re.compile(r'<meta\s+property=(?:"|\')og:url(?:"|\')\s+content=(?:"|\')([^"\']*)(?:"|\')\s*>', re.I)
-twitter_url_re = re.compile(r'<meta\s+name=(?:"|\')twitter:url(?:"|\')\s+content=(?:"|\')([^"\']*)(?:"|\')\s*>', re.I)
-og_image_re = re.compile(r'<meta\s+property=(?:"|\')og:image(?:"|\')\s+content=(?:"|\')([^"\']*)(?:"|\')\s*>', re.I)
-twitter_image_re = re.compile(r'<meta\s+name=(?:"|\')twitter:image(?:"|\')\s+content=(?:"|\')([^"\']*)(?:"|\')\s*>', re.I)
-
-assets_pattern = re.compile(r'^(?:https?://)?(?:www\.)?[^/]*(/assets/.*)$')
-
-for path in ROOT.rglob('*.html'):
-    text = path.read_text(encoding='utf-8')
-    original = text
-    url = page_url_for(path, args.domain)
-
-    # canonical
-    def repl_canonical(m):
-        return f'<link rel="canonical" href="{url}">' 
-    text = can_re.sub(repl_canonical, text)
-
-    # og:url
-    text = og_url_re.sub(f'<meta property="og:url" content="{url}">', text)
-
-    # twitter:url
-    text = twitter_url_re.sub(f'<meta name="twitter:url" content="{url}">', text)
-
-    # og:image
-    def fix_image(m):
-        src = m.group(1)
-        # if src already absolute on other host or starts with /assets or assets/ or https://assets
-        m2 = assets_pattern.match(src)
-        if m2:
-            asset_path = m2.group(1)
-            return f'<meta property="og:image" content="{args.domain}{asset_path}">' 
-        # If it is relative like "assets/..."
-        if src.startswith('assets/') or src.startswith('/assets/'):
-            path_part = src if src.startswith('/') else '/' + src
-            return f'<meta property="og:image" content="{args.domain}{path_part}">' 
-        return m.group(0)
-
-    text = og_image_re.sub(fix_image, text)
-
-    # twitter:image
-    def fix_t_image(m):
-        src = m.group(1)
-        m2 = assets_pattern.match(src)
-        if m2:
-            asset_path = m2.group(1)
-            return f'<meta name="twitter:image" content="{args.domain}{asset_path}">'
-        if src.startswith('assets/') or src.startswith('/assets/'):
-            path_part = src if src.startswith('/') else '/' + src
-            return f'<meta name="twitter:image" content="{args.domain}{path_part}">'
-        return m.group(0)
-
-    text = twitter_image_re.sub(fix_t_image, text)
-
-    if text != original:
-        changed.append(str(path))
-        if args.apply:
-            path.write_text(text, encoding='utf-8')
-
-if args.apply:
-    print(f'Updated {len(changed)} files:')
-    for p in changed:
-        print(p)
-else:
-    print('Dry-run: would update', len(changed), 'files')
-    for p in changed[:40]:
-        print(p)
-    if len(changed) > 40:
-        print('...')
\ No newline at end of file
+COMBINED_SUB = SOCIAL_TAGS_RE.sub
+SOCIAL_HINT = SOCIAL_HINT_RE.search
+ASSETS_MATCH = ASSETS_RE.match
+
+
+@lru_cache(maxsize=4096)
+def resolve_asset(src):
+    """Site path (/assets/...) for an assets/ image src, or None to leave it alone."""
+    # if src already absolute on other host or starts with /assets or assets/ or https://assets
+    m2 = ASSETS_MATCH(src)
+    if m2:
+        return m2.group(1)
+    # If it is relative like "assets/..."
+    if src.startswith('assets/') or src.startswith('/assets/'):
+        return src if src.startswith('/') else '/' + src
+    return None
+
+
+def url_tags_for(url):
+    """Final canonical/og:url/twitter:url tags for a page, keyed by group name."""
+    return {
+        'canonical': '<link rel="canonical" href="' + url + TAG_CLOSE,
+        'og_url': '<meta property="og:url" content="' + url + TAG_CLOSE,
+        'twitter_url': '<meta name="twitter:url" content="' + url + TAG_CLOSE,
+    }
+
+
+def dispatch(url_tags, changes, m):
+    """sub() callback; records the group name in changes when the tag is rewritten."""
+    name = m.lastgroup
+    old = m.group(0)
+    new = old
+    if name in url_tags:
+        new = url_tags[name]
+    elif name == 'og_image':
+        # shared social images repeat across pages, hence the cached resolver
+        asset_path = resolve_asset(m.group('og_image_src'))
+        if asset_path is not None:
+            new = OG_IMAGE_OPEN + asset_path + TAG_CLOSE
+    else:
+        asset_path = resolve_asset(m.group('twitter_image_src'))
+        if asset_path is not None:
+            new = TWITTER_IMAGE_OPEN + asset_path + TAG_CLOSE
+    if new != old:
+        changes.append(name)
+    return new
+
+
+def _init(domain, apply, cache):
+    global DOMAIN, APPLY, CACHE, OG_IMAGE_OPEN, TWITTER_IMAGE_OPEN
+    DOMAIN = domain
+    APPLY = apply
+    CACHE = cache
+    OG_IMAGE_OPEN = '<meta property="og:image" content="' + domain
+    TWITTER_IMAGE_OPEN = '<meta name="twitter:image" content="' + domain
+
+
+def process_file(path):
+    """Return (path, changed, digest). digest is None, so nothing is cached, for
+    files the prefilter rejects and for files left unwritten in a dry run."""
+    raw = read_bytes(path)
+    # cheap byte scan first: most pages carry none of the tags we rewrite, and
+    # rejecting them here is cheaper than hashing them
+    if not SOCIAL_HINT(raw):
+        return path, False, None
+    digest = content_digest(raw)
+    # the rewrite is idempotent, so output we produced last run needs no work
+    if CACHE.get(path) == digest:
+        return path, False, digest
+    text = raw.decode('utf-8')
+    # built once per page rather than once per matching tag
+    url_tags = url_tags_for(page_url_for(path, DOMAIN))
+
+    # only tags that actually differ are recorded, which avoids comparing
+    # the whole document afterwards
+    changes = []
+    new = COMBINED_SUB(partial(dispatch, url_tags, changes), text)
+
+    if not changes:
+        return path, False, digest
+    if APPLY:
+        new_raw = new.encode('utf-8')
+        write_bytes(path, new_raw)
+        return path, True, content_digest(new_raw)
+    return path, True, None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--domain', default='https://gotoolly.netlify.app')
+    parser.add_argument('--apply', action='store_true')
+    args = parser.parse_args()
+
+    # results depend on the domain, so keep a separate cache per domain
+    cache_key = 'fix_canonical_and_social:' + args.domain
+    cache = load_cache(cache_key)
+    digests = {}
+    changed = []
+    results = map_files(process_file, walk_files(str(ROOT)), _init, (args.domain, args.apply, cache))
+    for path, was_changed, digest in results:
+        if was_changed:
+            changed.append(path)
+        if digest is not None:
+            digests[path] = digest
+    save_cache(cache_key, digests)
+
+    if args.apply:
+        print(f'Updated {len(changed)} files:')
+        for p in changed:
+            print(p)
+    else:
+        print('Dry-run: would update', len(changed), 'files')
+        for p in changed[:40]:
+            print(p)
+        if len(changed) > 40:
+            print('...')
+
+
+if __name__ == '__main__':
+    main()
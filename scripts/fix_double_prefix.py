@@ -1,11 +1,27 @@
 #!/usr/bin/env python3
 from pathlib import Path
+
+from _html_files import map_files, read_bytes, walk_files, write_text
+
 ROOT = Path(__file__).resolve().parents[1]
-count = 0
-for path in ROOT.rglob('*.html'):
-    text = path.read_text(encoding='utf-8')
-    new = text.replace('/gotoolly.com/gotoolly.com/', '/gotoolly.com/')
-    if new != text:
-        path.write_text(new, encoding='utf-8')
-        count += 1
-print(f'Fixed {count} files')
\ No newline at end of file
+
+
+def process_file(path):
+    raw = read_bytes(path)
+    if b'/gotoolly.com/gotoolly.com/' not in raw:
+        return path, False
+    # the doubled prefix is present, so replacing it always shortens the text
+    new = raw.decode('utf-8').replace('/gotoolly.com/gotoolly.com/', '/gotoolly.com/')
+    write_text(path, new)
+    return path, True
+
+
+def main():
+    count = 0
+    for path, changed in map_files(process_file, walk_files(str(ROOT))):
+        count += changed
+    print(f'Fixed {count} files')
+
+
+if __name__ == '__main__':
+    main()
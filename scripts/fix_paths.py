@@ -8,42 +8,54 @@ Usage: python scripts/fix_paths.py --prefix /gotoolly.com [--apply]
 import argparse
 from pathlib import Path
 
-parser = argparse.ArgumentParser(description='Add repo prefix to root-absolute paths (dry-run by default)')
-parser.add_argument('--prefix', default='/gotoolly.com', help='Prefix to add to root paths (e.g., /gotoolly.com)')
-parser.add_argument('--apply', action='store_true', help='Write changes. Default: dry-run')
-args = parser.parse_args()
+from _html_files import map_files, read_text, walk_files, write_text
+from _html_regex import ROOT_PATH_RE
 
 ROOT = Path(__file__).resolve().parents[1]
-count = 0
-files_updated = []
 
-for path in ROOT.rglob('*.html'):
-    text = path.read_text(encoding='utf-8')
-    new_text = text
+# Set per worker process by _init()
+REPL = r'\g<1>/'
+APPLY = False
 
-    prefix = args.prefix.rstrip('/')
 
-    # Replace double-quote attributes
-    new_text = new_text.replace(' href="/', f' href="{prefix}/')
-    new_text = new_text.replace(' src="/', f' src="{prefix}/')
-
-    # Replace single-quote attributes
-    new_text = new_text.replace(" href='/", f" href='{prefix}/")
-    new_text = new_text.replace(" src='/", f" src='{prefix}/")
-
-    # Some inline JS uses patterns like l1.href = '/assets/...'
-    new_text = new_text.replace("'/assets/", f"'{prefix}/assets/")
-    new_text = new_text.replace('"/assets/', f'"{prefix}/assets/')
-
-    if new_text != text:
-        files_updated.append(str(path))
-        if args.apply:
-            path.write_text(new_text, encoding='utf-8')
-            count += 1
-
-if args.apply:
-    print(f"Updated {count} HTML files")
-    for f in files_updated:
-        print(f)
-else:
-    print(f"Dry-run: {len(files_updated)} files would be modified. Run with --apply to write changes.")
\ No newline at end of file
+def _init(prefix, apply):
+    global REPL, APPLY
+    REPL = r'\g<1>' + prefix.replace('\\', r'\\') + '/'
+    APPLY = apply
+
+
+def process_file(path):
+    text = read_text(path)
+    new_text, n = ROOT_PATH_RE.subn(REPL, text)
+
+    if not n:
+        return path, False
+    if APPLY:
+        write_text(path, new_text)
+    return path, True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Add repo prefix to root-absolute paths (dry-run by default)')
+    parser.add_argument('--prefix', default='/gotoolly.com', help='Prefix to add to root paths (e.g., /gotoolly.com)')
+    parser.add_argument('--apply', action='store_true', help='Write changes. Default: dry-run')
+    args = parser.parse_args()
+
+    prefix = args.prefix.rstrip('/')
+    files_updated = []
+    # an empty prefix would rewrite every match to itself, i.e. change nothing
+    if prefix:
+        for path, changed in map_files(process_file, walk_files(str(ROOT)), _init, (prefix, args.apply)):
+            if changed:
+                files_updated.append(path)
+
+    if args.apply:
+        print(f"Updated {len(files_updated)} HTML files")
+        for f in files_updated:
+            print(f)
+    else:
+        print(f"Dry-run: {len(files_updated)} files would be modified. Run with --apply to write changes.")
+
+
+if __name__ == '__main__':
+    main()
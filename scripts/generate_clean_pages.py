@@ -23,27 +23,29 @@ Notes:
 """
 
 import argparse
+import os
 import pathlib
 import shutil
-import re
 from datetime import datetime
 
+from _html_files import walk_files
+from _html_regex import CANONICAL_RE, CANONICAL_WORD_RE
+
 ROOT = pathlib.Path(__file__).resolve().parent.parent
 PAGES_DIR = ROOT / 'pages'
 EXCLUDE_DIRS = {'assets', '.git'}
 
 HTML_EXT = '.html'
 
-CANONICAL_RE = re.compile(r'(<link[^>]*rel=["\']canonical["\'][^>]*href=["\'])([^"\']+)(["\'][^>]*>)', re.I)
-
 
 def find_page_files(root: pathlib.Path):
-    if not (root / 'pages').exists():
-        return []
-    files = list((root / 'pages').rglob('*.html'))
+    # Lazy: run() consumes pages as the walk finds them, nothing is materialized
+    pages = root / 'pages'
+    if not pages.exists():
+        return
     # exclude files in assets, etc (though pages should not contain these)
-    results = [f for f in files if not any(p in EXCLUDE_DIRS for p in f.parts)]
-    return results
+    for p in walk_files(str(pages), skip=EXCLUDE_DIRS):
+        yield pathlib.Path(p)
 
 
 def ensure_dir(path: pathlib.Path):
@@ -52,22 +54,21 @@ def ensure_dir(path: pathlib.Path):
 
 def add_canonical_to_html(content: str, canonical_url: str) -> (str, bool):
     # If a canonical exists, replace href with canonical_url; else, insert in head
-    changed = False
-    if CANONICAL_RE.search(content):
-        new_content = CANONICAL_RE.sub(lambda m: m.group(1) + canonical_url + m.group(3), content)
-        if new_content != content:
-            changed = True
-        return new_content, changed
+    # Most legacy pages carry no canonical at all; a literal search for the word
+    # lets them skip the full tag regex (case-insensitive, like CANONICAL_RE)
+    if CANONICAL_WORD_RE.search(content):
+        new_content, n = CANONICAL_RE.subn(lambda m: m.group(1) + canonical_url + m.group(3), content)
+        if n:
+            return new_content, new_content != content
+    # Insert canonical just before </head>
+    insert = f'  <link rel="canonical" href="{canonical_url}">\n'
+    if '</head>' in content:
+        new_content = content.replace('</head>', insert + '</head>')
+        return new_content, True
     else:
-        # Insert canonical just before </head>
-        insert = f'  <link rel="canonical" href="{canonical_url}">\n'
-        if '</head>' in content:
-            new_content = content.replace('</head>', insert + '</head>')
-            return new_content, True
-        else:
-            # fallback: append at beginning
-            new_content = insert + content
-            return new_content, True
+        # fallback: append at beginning
+        new_content = insert + content
+        return new_content, True
 
 
 def add_meta_refresh(content: str, target_url: str, seconds: int = 0) -> (str, bool):
@@ -86,11 +87,27 @@ def add_meta_refresh(content: str, target_url: str, seconds: int = 0) -> (str, b
 
 
 def write_backup(path: pathlib.Path):
+    # Hardlink instead of copying; the original must then be rewritten with
+    # replace_file() so the link keeps the old inode (and content).
     bak = path.with_suffix(path.suffix + '.bak')
-    shutil.copy2(path, bak)
+    bak.unlink(missing_ok=True)
+    try:
+        os.link(path, bak)
+    except OSError:
+        # e.g. filesystem without hardlink support
+        shutil.copy2(path, bak)
     return bak
 
 
+def replace_file(path: pathlib.Path, content: str):
+    # Write to a sibling temp file and rename over path, never truncating in place
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    tmp.write_bytes(content.encode('utf-8'))
+    if path.exists():
+        shutil.copymode(path, tmp)
+    os.replace(tmp, path)
+
+
 def run(dry_run=True, apply=False, canonical_old=False, redirect_old=False, redirect_type='meta', domain='https://gotoolly.com', force=False):
     files = find_page_files(ROOT)
     created = []
@@ -111,13 +128,15 @@ def run(dry_run=True, apply=False, canonical_old=False, redirect_old=False, redi
         if dry_run:
             print(f"[DRY] Will create: {target_index}  (from {f})  canonical: {clean_url}")
         else:
+            # source is read at most once, and only if the clean copy or the
+            # legacy update below needs it
+            content = None
             # create target_dir
             if target_index.exists() and not force:
                 print(f"Skipping existing target {target_index}; use --force to overwrite")
             else:
                 ensure_dir(target_dir)
-                # read source
-                content = f.read_text(encoding='utf-8')
+                content = f.read_bytes().decode('utf-8')
                 # update canonical in the created clean page to point to clean URL
                 new_content, changed_canon = add_canonical_to_html(content, clean_url)
                 # write target_index
@@ -125,14 +144,15 @@ def run(dry_run=True, apply=False, canonical_old=False, redirect_old=False, redi
                 if target_index.exists() and force:
                     write_backup_target = True
                     write_backup(target_index)
-                target_index.write_text(new_content, encoding='utf-8')
+                replace_file(target_index, new_content)
                 created.append(target_index)
                 print(f"Created {target_index}")
 
             # Optionally modify old page (canonical or redirect)
             if canonical_old or redirect_old:
-                orig_content = f.read_text(encoding='utf-8')
-                new_orig = orig_content
+                if content is None:
+                    content = f.read_bytes().decode('utf-8')
+                new_orig = content
                 changed_any = False
                 if canonical_old:
                     new_orig, changed = add_canonical_to_html(new_orig, clean_url)
@@ -142,7 +162,7 @@ def run(dry_run=True, apply=False, canonical_old=False, redirect_old=False, redi
                     changed_any = changed_any or changed
                 if changed_any:
                     write_backup(f)
-                    f.write_text(new_orig, encoding='utf-8')
+                    replace_file(f, new_orig)
                     modified.append(f)
                     print(f"Updated legacy file {f} (canonical/redirect added)")
 
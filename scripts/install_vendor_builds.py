@@ -5,7 +5,9 @@ Usage: python scripts/install_vendor_builds.py [--apply]
 - Dry-run by default; use --apply to actually write files.
 """
 import argparse
-import requests
+import asyncio
+import os
+import aiohttp
 from pathlib import Path
 
 parser = argparse.ArgumentParser()
@@ -21,14 +23,41 @@ files = [
     ('https://cdn.jsdelivr.net/npm/@tensorflow-models/body-pix@2.0.5/dist/body-pix.min.js', VENDOR / 'body-pix.min.js'),
 ]
 
+
+async def fetch(session, url, path):
+    print(f"Downloading {url}...")
+    # stream to a sibling .part file instead of buffering the whole bundle in
+    # memory, and only swap it in once complete so a failed download leaves
+    # the existing bundle untouched
+    part = path.with_suffix(path.suffix + '.part')
+    try:
+        async with session.get(url) as resp:
+            resp.raise_for_status()
+            # plain blocking writes on the event loop: with two files and 64 KiB
+            # chunks the stall is negligible, so no executor hop is needed
+            with open(part, 'wb') as f:
+                async for chunk in resp.content.iter_chunked(64 * 1024):
+                    f.write(chunk)
+        os.replace(part, path)
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+    print(f"Saved {path}")
+
+
+async def download_all():
+    # both bundles download concurrently through one session; aiohttp speaks
+    # HTTP/1.1, so that means one connection (and TLS handshake) per bundle
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=30)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        await asyncio.gather(*(fetch(session, url, path) for url, path in files))
+
+
 for url, path in files:
     print(f"Would download: {url} -> {path}")
-    if args.apply:
-        print(f"Downloading {url}...")
-        resp = requests.get(url, timeout=30)
-        resp.raise_for_status()
-        path.write_bytes(resp.content)
-        print(f"Saved {path}")
+
+if args.apply:
+    asyncio.run(download_all())
 
 if not args.apply:
     print('\nDry-run complete. Pass --apply to download files.')
@@ -1,13 +1,33 @@
 #!/usr/bin/env python3
 from pathlib import Path
+
+from _html_files import map_files, read_bytes, rewrite_tail, walk_files
+from _html_regex import BASE_RE
+
 ROOT = Path(__file__).resolve().parents[1]
-count = 0
-for path in ROOT.rglob('*.html'):
-    text = path.read_text(encoding='utf-8')
-    new = text.replace('\n    <base href="/gotoolly.com/">', '')
-    new = new.replace('<base href="/gotoolly.com/">\n', '')
-    new = new.replace('<base href="/gotoolly.com/">', '')
-    if new != text:
-        path.write_text(new, encoding='utf-8')
-        count += 1
-print(f'Removed base tag from {count} files')
\ No newline at end of file
+
+BASE_TAG = b'<base href="/gotoolly.com/">'
+
+
+def process_file(path):
+    raw = read_bytes(path)
+    idx = raw.find(BASE_TAG)
+    if idx < 0:
+        return path, False
+    # a match starts at most 6 bytes ('\r\n    ') before the first tag
+    start = BASE_RE.search(raw, max(0, idx - 6)).start()
+    # patch bytes in place from the first match on; no decode, and the head
+    # of the file is left untouched
+    rewrite_tail(path, start, BASE_RE.sub(b'', raw[start:]))
+    return path, True
+
+
+def main():
+    count = 0
+    for path, changed in map_files(process_file, walk_files(str(ROOT))):
+        count += changed
+    print(f'Removed base tag from {count} files')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,19 +2,45 @@
 """
 Remove the legacy "/gotoolly.com" root prefix from HTML/JS/CSS files.
 """
+import mmap
+import os
 from pathlib import Path
+
+from _html_files import map_files, rewrite_tail, walk_files
+
 ROOT = Path(__file__).resolve().parents[1]
 exts = ('.html', '.js', '.css')
-count = 0
-files = []
-for path in ROOT.rglob('*'):
-    if path.suffix.lower() in exts:
-        text = path.read_text(encoding='utf-8')
-        if '/gotoolly.com' in text:
-            new = text.replace('/gotoolly.com', '')
-            path.write_text(new, encoding='utf-8')
-            files.append(str(path))
-            count += 1
-print(f'Removed prefix in {count} files')
-for f in files:
-    print(f)
+PREFIX = b'/gotoolly.com'
+
+
+def process_file(path):
+    # search the mapped pages directly; only files with a hit get copied out
+    with open(path, 'rb') as f:
+        # empty files cannot be mapped (and have nothing to strip)
+        if os.fstat(f.fileno()).st_size == 0:
+            return path, False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            idx = mm.find(PREFIX)
+            if idx < 0:
+                return path, False
+            # bytes before the first hit are unchanged, so only the tail is
+            # copied out and patched back in place
+            tail = mm[idx:]
+    rewrite_tail(path, idx, tail.replace(PREFIX, b''))
+    return path, True
+
+
+def main():
+    files = []
+    # assets/ holds the JS/CSS we want, so only prune VCS and dependency dirs here
+    paths = walk_files(str(ROOT), suffixes=exts, skip={'.git', 'node_modules'})
+    for path, changed in map_files(process_file, paths):
+        if changed:
+            files.append(path)
+    print(f'Removed prefix in {len(files)} files')
+    for f in files:
+        print(f)
+
+
+if __name__ == '__main__':
+    main()
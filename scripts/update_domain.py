@@ -6,6 +6,7 @@ Default is dry-run unless --apply is passed.
 """
 import argparse
 from pathlib import Path
+import re
 
 parser = argparse.ArgumentParser(description='Update legacy domain to new domain in files')
 parser.add_argument('--domain', default='https://gotoolly.netlify.app', help='New canonical domain')
@@ -14,7 +15,10 @@ args = parser.parse_args()
 
 ROOT = Path(__file__).resolve().parents[1]
 OLDS = ['https://gotoolly.com', 'https://www.gotoolly.com']
+# Longest first, so an old domain that extends another wins the alternation
+OLDS_RE = re.compile('|'.join(re.escape(o) for o in sorted(OLDS, key=len, reverse=True)))
 NEW = args.domain
+NEW_REPL = NEW.replace('\\', r'\\')  # escaped for use as a sub() template
 
 files_to_check = [
     'sitemap.xml',
@@ -28,17 +32,16 @@ for rel in files_to_check:
     p = ROOT / rel
     if not p.exists():
         continue
-    text = p.read_text(encoding='utf-8')
-    replaced = False
-    new_text = text
-    for old in OLDS:
-        if old in new_text:
-            new_text = new_text.replace(old, NEW)
-            replaced = True
+    raw = p.read_bytes()
+    # both legacy domains contain this, so skip decoding files that have neither
+    if b'gotoolly.com' not in raw:
+        continue
+    text = raw.decode('utf-8')
+    new_text, n = OLDS_RE.subn(NEW_REPL, text)
 
-    if replaced:
+    if n:
         if args.apply:
-            p.write_text(new_text, encoding='utf-8')
+            p.write_bytes(new_text.encode('utf-8'))
             updated.append(str(p))
         else:
             print(f"[DRY-RUN] Would update: {p}")